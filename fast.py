@@ -1,11 +1,14 @@
-import can
+import socket
 import time
 import struct
 import math
-import numpy as np
 import sys
+import threading
+import numpy as np
 import matplotlib.pyplot as plt
 
+import control_kernel
+
 # --- CONFIGURATION ---
 CAN_INTERFACE = 'can0'
 MOTOR_ID = 1
@@ -17,9 +20,15 @@ CONTROL_FREQ = 1000.0
 DT = 1.0 / CONTROL_FREQ
 
 # --- MOTION PARAMETERS ---
-SINE_AMPLITUDE = 1.0 
+SINE_AMPLITUDE = 1.0
 SINE_FREQUENCY = 1.0 # Faster wave (1 full cycle per second)
 
+# History buffer capacity (longest run we keep samples for)
+MAX_RUN_SECONDS = 600.0
+# Record every k-th tick: 200Hz of history is plenty for the plot and it
+# bounds memory at the source instead of thinning at plot time
+RECORD_DECIMATE = 5
+
 # --- GAINS ---
 KP_GAIN = 20.0  
 KD_GAIN = 1.0   
@@ -37,122 +46,221 @@ MOTOR_TYPE_PARAMS = {
 }
 MOTOR_ID_TO_TYPE_MAP = { 19: 'O3', 18: 'O3', 16: 'O3', 17: 'O3', 2: 'O2', 5: 'O5', 127: 'O2', 1: 'O2' }
 
-current_motor_state = {'pos': 0.0, 'vel': 0.0, 'last_update': 0.0}
-history = {"time": [], "target": [], "actual": []}
+# Precompute 1/(max-min) for each range so the hot-path scaling is multiply-only
+for _p in MOTOR_TYPE_PARAMS.values():
+    for _k in ('P', 'V', 'KP', 'KD', 'T'):
+        _p['_%s_INV' % _k] = 1.0 / (_p['%s_MAX' % _k] - _p['%s_MIN' % _k])
 
-def scale_value_to_u16(value, v_min, v_max):
-    return int(65535.0 * (np.clip(value, v_min, v_max) - v_min) / (v_max - v_min))
+class MotorState:
+    # __slots__: fixed offsets instead of hashing dict keys on every
+    # feedback write / loop read
+    __slots__ = ('pos', 'vel')
 
-def unscale_u16_to_float(val_u16, v_min, v_max):
-    return (float(val_u16) / 65535.0) * (v_max - v_min) + v_min
+    def __init__(self):
+        self.pos = 0.0
+        self.vel = 0.0
 
-def send_control_command(bus, motor_id, pos, vel, kp, kd, torque, params):
-    angle_u16 = scale_value_to_u16(pos, params['P_MIN'], params['P_MAX'])
-    vel_u16 = scale_value_to_u16(vel, params['V_MIN'], params['V_MAX'])
-    kp_u16 = scale_value_to_u16(kp, params['KP_MIN'], params['KP_MAX'])
-    kd_u16 = scale_value_to_u16(kd, params['KD_MIN'], params['KD_MAX'])
-    torque_u16 = scale_value_to_u16(torque, params['T_MIN'], params['T_MAX'])
+current_motor_state = MotorState()
 
-    mux_part = (MUX_CONTROL & 0xFF) << 24
-    torque_part = (torque_u16 & 0xFFFF) << 8
-    id_part = motor_id & 0xFF
-    arbitration_id = mux_part | torque_part | id_part
+_INV_65535 = 1.0 / 65535.0
 
-    data = struct.pack('>HHHH', angle_u16, vel_u16, kp_u16, kd_u16)
-    bus.send(can.Message(arbitration_id=arbitration_id, data=data, is_extended_id=True, dlc=8))
+# Raw SocketCAN frame layout: u32 can_id, u8 len, 3 pad bytes, 8 data bytes
+_RAW_FRAME = struct.Struct('=IB3x8s')
+_raw_unpack = _RAW_FRAME.unpack
+
+# Reusable 16-byte SocketCAN tx frame. The kernel's uint8 output view aliases
+# the frame's data bytes, so the scaled payload lands directly in the buffer
+# handed to send(); only the 4-byte can_id changes per tick.
+_TX_FRAME = bytearray(16)
+_TX_FRAME[4] = 8  # dlc
+_FRAME_OUT = np.frombuffer(_TX_FRAME, dtype=np.uint8, offset=8)
+_arb_pack_into = struct.Struct('=I').pack_into
+
+def send_control_command(sock, motor_id, pos, vel, kp, kd, torque, limits):
+    # All the scaling/packing arithmetic lives in the compiled kernel
+    arbitration_id = control_kernel.build_frame(pos, vel, kp, kd, torque, limits, motor_id, _FRAME_OUT)
+    _arb_pack_into(_TX_FRAME, 0, arbitration_id | socket.CAN_EFF_FLAG)
+    sock.send(_TX_FRAME)
+
+def read_feedback(sock, params):
+    # Drain every queued frame straight off the bus's socket fd with
+    # MSG_DONTWAIT. python-can's recv(timeout=0) runs a select() per call;
+    # this path is one recv syscall per frame and nothing else.
+    # Hoist the unscale constants out of the drain loop
+    p_min = params['P_MIN']
+    p_span = (params['P_MAX'] - p_min) * _INV_65535
+    v_min = params['V_MIN']
+    v_span = (params['V_MAX'] - v_min) * _INV_65535
 
-def read_feedback(bus, params):
     while True:
-        msg = bus.recv(timeout=0)
-        if msg is None: break
-        if msg.is_error_frame: continue
+        try:
+            frame = sock.recv(16, socket.MSG_DONTWAIT)
+        except BlockingIOError:
+            break
+        can_id, _dlc, data = _raw_unpack(frame)
+        if can_id & socket.CAN_ERR_FLAG: continue
+        arb_id = can_id & socket.CAN_EFF_MASK
 
         # Check standard and biped ID locations
-        extracted_motor_id = (msg.arbitration_id & 0xFF00) >> 8
+        extracted_motor_id = (arb_id & 0xFF00) >> 8
         if extracted_motor_id != MOTOR_ID:
-            extracted_motor_id = msg.arbitration_id & 0xFF
+            extracted_motor_id = arb_id & 0xFF
 
         if extracted_motor_id == MOTOR_ID:
-            try:
-                p_raw = struct.unpack('>H', msg.data[0:2])[0]
-                v_raw = struct.unpack('>H', msg.data[2:4])[0]
-                pos_rad = unscale_u16_to_float(p_raw, params['P_MIN'], params['P_MAX'])
-                vel_rad = unscale_u16_to_float(v_raw, params['V_MIN'], params['V_MAX'])
-                
-                current_motor_state['pos'] = pos_rad
-                current_motor_state['vel'] = vel_rad
-                current_motor_state['last_update'] = time.time()
-            except: pass
+            # Index the two big-endian u16s directly: no slice, no tuple.
+            # No timestamp here on purpose — nothing read it and it cost a
+            # clock call per frame.
+            p_raw = (data[0] << 8) | data[1]
+            v_raw = (data[2] << 8) | data[3]
+            current_motor_state.pos = p_raw * p_span + p_min
+            current_motor_state.vel = v_raw * v_span + v_min
 
 if __name__ == "__main__":
     motor_type = MOTOR_ID_TO_TYPE_MAP.get(MOTOR_ID)
     params = MOTOR_TYPE_PARAMS[motor_type]
-    
+    limits = control_kernel.limits_array(params)
+
+    # Warm up the JIT now so the first timed tick doesn't pay the compile cost
+    control_kernel.build_frame(0.0, 0.0, 0.0, 0.0, 0.0, limits, MOTOR_ID, _FRAME_OUT)
+
     print(f"--- 1000 Hz HIGH PERFORMANCE TEST ---")
     print(f"Motor: {params['name']} (ID {MOTOR_ID})")
     
-    bus = can.interface.Bus(channel=CAN_INTERFACE, bustype='socketcan')
+    # Status printing runs on its own thread: print() formats a string and
+    # blocks on terminal I/O, which has no place inside a 1ms loop. The
+    # control loop just drops floats into this slot; the printer reads the
+    # latest values at 10Hz (single writer/single reader, so no lock needed).
+    _print_slot = [0.0, 0.0, 0.0]  # target, actual, rate
+    _printer_stop = threading.Event()
+
+    def _printer():
+        while not _printer_stop.is_set():
+            time.sleep(0.1)
+            tgt, act, hz = _print_slot
+            print(f"Tgt: {tgt:6.3f} | Act: {act:6.3f} | Rate: {hz:4.0f}Hz")
+
+    # Fixed enable/disable frames, built once
+    ENABLE_FRAME = _RAW_FRAME.pack((MUX_ENABLE << 24) | (HOST_ID << 8) | MOTOR_ID | socket.CAN_EFF_FLAG, 8, bytes(8))
+    DISABLE_FRAME = _RAW_FRAME.pack((MUX_DISABLE << 24) | (HOST_ID << 8) | MOTOR_ID | socket.CAN_EFF_FLAG, 8, bytes(8))
+
+    # Talk to SocketCAN directly: python-can's Message objects and listener
+    # machinery cost more than the actual frame I/O on a 1ms budget
+    sock = socket.socket(socket.AF_CAN, socket.SOCK_RAW, socket.CAN_RAW)
+    sock.bind((CAN_INTERFACE,))
+
+    # Preallocated history: appending to Python lists at 1kHz keeps resizing
+    # and boxing floats; fixed float64 arrays are written in place instead
+    MAX_SAMPLES = int(CONTROL_FREQ * MAX_RUN_SECONDS) // RECORD_DECIMATE
+    t_buf = np.empty(MAX_SAMPLES)
+    tgt_buf = np.empty_like(t_buf)
+    act_buf = np.empty_like(t_buf)
+    n_samples = 0
 
     try:
         print("Enabling...")
-        bus.send(can.Message(arbitration_id=(MUX_ENABLE << 24) | (HOST_ID << 8) | MOTOR_ID, is_extended_id=True, dlc=8))
+        sock.send(ENABLE_FRAME)
         time.sleep(1)
         
         print("Running 1kHz Loop. Press Ctrl+C to stop.")
-        start_time = time.time()
-        last_loop_time = start_time
-        
+        threading.Thread(target=_printer, daemon=True).start()
+
+        # Pace off the monotonic clock with an absolute deadline per tick.
+        # time.time() is wall clock (NTP can step it) and sleep(DT - work)
+        # accumulates every overshoot; an absolute next_tick schedule doesn't.
+        perf = time.perf_counter_ns
+        DT_NS = int(DT * 1e9)
+        start_ns = perf()
+        next_tick = start_ns
+        last_loop_ns = start_ns
+        tick = 0
+
+        # Bind hot lookups to bare names: each tick then pays one name lookup
+        # instead of an attribute chain (sock.send, ...)
+        _send = sock.send
+        _build_frame = control_kernel.build_frame
+        _state = current_motor_state
+        _EFF = socket.CAN_EFF_FLAG
+
+        # Rotating-phasor sine generator: instead of calling sin/cos every tick,
+        # keep (c, s) = (cos(wt), sin(wt)) and advance them by a fixed per-tick
+        # rotation. Two multiplies + two adds replace two transcendental calls.
+        W = 2 * math.pi * SINE_FREQUENCY
+        A = SINE_AMPLITUDE
+        dC = math.cos(W * DT)
+        dS = math.sin(W * DT)
+        c, s = 1.0, 0.0
+        renorm_countdown = 1000
+
         while True:
-            loop_start = time.time()
-            elapsed_total = loop_start - start_time
-            
+            loop_start_ns = perf()
+            elapsed_total = (loop_start_ns - start_ns) * 1e-9
+
             # 1. Read
-            read_feedback(bus, params)
-            
-            # 2. Calculate (Fast Sine Wave)
-            target_pos = SINE_AMPLITUDE * math.sin(2 * math.pi * SINE_FREQUENCY * elapsed_total)
-            target_vel = (SINE_AMPLITUDE * 2 * math.pi * SINE_FREQUENCY) * math.cos(2 * math.pi * SINE_FREQUENCY * elapsed_total)
-            
-            # 3. Write
-            send_control_command(bus, MOTOR_ID, target_pos, target_vel, KP_GAIN, KD_GAIN, 0.0, params)
+            read_feedback(sock, params)
             
-            # 4. Record
-            history["time"].append(elapsed_total)
-            history["target"].append(target_pos)
-            history["actual"].append(current_motor_state['pos'])
-
-            # 5. Print Stats (Every 100 cycles = 10Hz print rate)
-            if int(elapsed_total * CONTROL_FREQ) % 100 == 0:
-                real_dt = loop_start - last_loop_time
-                real_hz = 1.0 / real_dt if real_dt > 0 else 0.0
-                print(f"Tgt: {target_pos:6.3f} | Act: {current_motor_state['pos']:6.3f} | Rate: {real_hz:4.0f}Hz")
-            
-            last_loop_time = loop_start
-            
-            # 6. Sleep to maintain 1000Hz exactly
-            process_duration = time.time() - loop_start
-            sleep_time = DT - process_duration
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+            # 2. Calculate (Fast Sine Wave via phasor recurrence)
+            target_pos = A * s
+            target_vel = A * W * c
+            c, s = c * dC - s * dS, s * dC + c * dS
+            renorm_countdown -= 1
+            if renorm_countdown == 0:
+                # Renormalize once a second so FP rounding can't make the
+                # phasor's amplitude drift over long runs
+                renorm_countdown = 1000
+                norm = math.hypot(c, s)
+                c /= norm
+                s /= norm
+
+            # 3. Write (the kernel has already filled the tx frame's payload)
+            _arb_pack_into(_TX_FRAME, 0, _build_frame(target_pos, target_vel, KP_GAIN, KD_GAIN, 0.0, limits, MOTOR_ID, _FRAME_OUT) | _EFF)
+            _send(_TX_FRAME)
+
+            # 4. Record every RECORD_DECIMATE-th tick (stop rather than
+            # overrun the buffer)
+            if tick % RECORD_DECIMATE == 0 and n_samples < MAX_SAMPLES:
+                t_buf[n_samples] = elapsed_total
+                tgt_buf[n_samples] = target_pos
+                act_buf[n_samples] = _state.pos
+                n_samples += 1
+
+            # 5. Publish stats every 100 cycles; the printer thread does the
+            # formatting and terminal I/O
+            if tick % 100 == 0:
+                real_dt = (loop_start_ns - last_loop_ns) * 1e-9
+                _print_slot[0] = target_pos
+                _print_slot[1] = _state.pos
+                _print_slot[2] = 1.0 / real_dt if real_dt > 0 else 0.0
+
+            last_loop_ns = loop_start_ns
+            tick += 1
+
+            # 6. Hold 1000Hz: sleep off most of the slack, busy-wait the last
+            # ~150us (Linux sleep wakes with tens of us of slack)
+            next_tick += DT_NS
+            remaining = next_tick - perf()
+            if remaining > 200_000:
+                time.sleep((remaining - 150_000) * 1e-9)
+            while perf() < next_tick:
+                pass
                 
     except KeyboardInterrupt:
         print("\nSTOPPING...")
     except Exception as e:
         print(f"Error: {e}")
     finally:
+        _printer_stop.set()
         print("Disabling...")
-        bus.send(can.Message(arbitration_id=(MUX_DISABLE << 24) | (HOST_ID << 8) | MOTOR_ID, is_extended_id=True, dlc=8))
+        sock.send(DISABLE_FRAME)
         time.sleep(0.5)
-        bus.shutdown()
+        sock.close()
         
         # Plot
-        if len(history["time"]) > 0:
+        if n_samples > 0:
             print("Plotting...")
-            # Downsample plot data so it doesn't freeze matplotlib (1000Hz generates a LOT of points)
-            step = 5 
+            # History is already decimated at record time, so plot it as-is
             plt.figure(figsize=(10, 6))
-            plt.plot(history["time"][::step], history["target"][::step], label='Target', linestyle='--', color='orange')
-            plt.plot(history["time"][::step], history["actual"][::step], label='Actual', color='blue', alpha=0.6)
+            plt.plot(t_buf[:n_samples], tgt_buf[:n_samples], label='Target', linestyle='--', color='orange')
+            plt.plot(t_buf[:n_samples], act_buf[:n_samples], label='Actual', color='blue', alpha=0.6)
             plt.title(f"1000 Hz Control Response - {params['name']}")
             plt.legend()
             plt.grid(True)
@@ -1,5 +1,7 @@
 import robstride.client
 import can
+import struct
+import threading
 import time
 import atexit
 
@@ -40,6 +42,54 @@ def safe_read_param(client, bus, motor_id, param_name, retries=3):
     print(f"[FAILED] Could not read '{param_name}' from motor {motor_id} after {retries} attempts.")
     return None
 
+# --- Background pollers ---
+HOST_ID = 0xAA
+MECHPOS_ID = robstride.client.param_ids_by_name['mechpos']
+MECHVEL_ID = robstride.client.param_ids_by_name['mechvel']
+READ_PARAM = robstride.client.MotorMsg.ReadParam.value
+_unpack_f32_from = struct.Struct('<f').unpack_from
+
+latest = {}  # motor_id -> [pos, vel]
+latest_lock = threading.Lock()
+stop_event = threading.Event()
+
+def poll_bus(bus, motor_ids):
+    """Per-bus poller: send every mechpos/mechvel query in one burst, then
+    drain all the replies together. One thread per bus means the two CAN
+    buses' round-trips overlap instead of being read one motor at a time."""
+    requests = []
+    for motor_id in motor_ids:
+        arb_id = motor_id | (HOST_ID << 8) | (READ_PARAM << 24)
+        for param_id in (MECHPOS_ID, MECHVEL_ID):
+            data = bytes([param_id & 0xFF, param_id >> 8, 0, 0, 0, 0, 0, 0])
+            requests.append(can.Message(arbitration_id=arb_id, data=data, is_extended_id=True))
+
+    while not stop_event.is_set():
+        for msg in requests:
+            try:
+                bus.send(msg)
+            except can.CanError:
+                pass  # tx queue full; the next cycle re-asks anyway
+        # Collect until the bus goes quiet
+        while True:
+            resp = bus.recv(timeout=0.02)
+            if resp is None:
+                break
+            if resp.is_error_frame:
+                continue
+            if (resp.arbitration_id >> 24) & 0x1F != READ_PARAM:
+                continue
+            motor_id = (resp.arbitration_id >> 8) & 0xFF
+            param_id = resp.data[0] | (resp.data[1] << 8)
+            value = _unpack_f32_from(resp.data, 4)[0]
+            with latest_lock:
+                entry = latest.setdefault(motor_id, [None, None])
+                if param_id == MECHPOS_ID:
+                    entry[0] = value
+                elif param_id == MECHVEL_ID:
+                    entry[1] = value
+        time.sleep(0.01)
+
 def safe_disable(client, bus, motor_id, retries=3):
     for attempt in range(retries):
         try:
@@ -63,6 +113,8 @@ for bus in buses:
 min_angles = {motor_id: float('inf') for ids in motor_ids_list for motor_id in ids}
 max_angles = {motor_id: float('-inf') for ids in motor_ids_list for motor_id in ids}
 
+pollers = []
+
 try:
     print("Enabling motors in OPERATIONAL mode context...")
     for client, bus, motor_ids in zip(clients, buses, motor_ids_list):
@@ -79,19 +131,24 @@ try:
     print("\nRotate the motors by hand. Press Ctrl+C to stop.")
     print("Recording min/max angles from the LOW-LEVEL OPERATIONAL encoder...")
 
+    # One poller thread per bus; the main thread only renders the display
+    for bus, motor_ids in zip(buses, motor_ids_list):
+        t = threading.Thread(target=poll_bus, args=(bus, motor_ids), daemon=True)
+        t.start()
+        pollers.append(t)
+
     while True:
         output_lines = []
-        for client, bus, motor_ids in zip(clients, buses, motor_ids_list):
-            for motor_id in motor_ids:
-                # 'mechpos' will now return the value relevant to the current 'run_mode'
-                current_angle_raw = safe_read_param(client, bus, motor_id, 'mechpos')
-                velocity_rps = safe_read_param(client, bus, motor_id, 'mechvel')
+        with latest_lock:
+            snapshot = {mid: tuple(entry) for mid, entry in latest.items()}
 
-                if current_angle_raw is None or velocity_rps is None:
+        for motor_ids in motor_ids_list:
+            for motor_id in motor_ids:
+                entry = snapshot.get(motor_id)
+                if entry is None or entry[0] is None or entry[1] is None:
                     continue
 
-                rad = current_angle_raw
-                velocity_rps = velocity_rps
+                rad, velocity_rps = entry
 
                 min_angles[motor_id] = min(min_angles[motor_id], rad)
                 max_angles[motor_id] = max(max_angles[motor_id], rad)
@@ -117,6 +174,11 @@ except KeyboardInterrupt:
                   f"Range = {range_rad:.3f} rad")
 
 finally:
+    # Stop the pollers before the clients touch the buses again
+    stop_event.set()
+    for t in pollers:
+        t.join(timeout=1.0)
+
     print("\nDisabling all motors...")
     for client, bus, motor_ids in zip(clients, buses, motor_ids_list):
         for motor_id in motor_ids:
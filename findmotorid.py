@@ -1,55 +1,70 @@
 import robstride.client
 import can
+import struct
 import time
 
 # --- CONFIG ---
 INTERFACE = 'can0'
+HOST_ID = 0xAA
+# Stop collecting once the bus has been quiet this long
+COLLECT_QUIET_SEC = 0.05
+# Hard cap on the whole collection phase
+COLLECT_MAX_SEC = 1.0
+
+VBUS_PARAM_ID = robstride.client.param_ids_by_name['vbus']
+READ_PARAM = robstride.client.MotorMsg.ReadParam.value
+_unpack_f32_from = struct.Struct('<f').unpack_from
 
 def flush_bus(bus):
     """Clear the buffer to ensure we aren't reading old messages"""
-    while True:
-        msg = bus.recv(timeout=0)
-        if msg is None:
-            break
+    while bus.recv(timeout=0) is not None:
+        pass
 
 print(f"Initializing {INTERFACE}...")
-# We set a short timeout (0.05s) so the scan is fast
-bus = can.interface.Bus(interface='socketcan', channel=INTERFACE, timeout=0.05)
-client = robstride.client.Client(bus)
+bus = can.interface.Bus(interface='socketcan', channel=INTERFACE)
 
 print("-" * 40)
 print("STARTING PASSIVE SCAN (ID 1 - 127)")
 print("This will NOT move or enable the motor.")
 print("-" * 40)
 
-found_ids = []
+flush_bus(bus)
 
+# Fire all 127 vbus read requests back-to-back, then drain the replies in one
+# pass. The old scan waited for a reply (or timeout) per ID, so a mostly-empty
+# bus cost 127 x timeout; this way the absent IDs cost nothing.
+# Reading 'vbus' is a READ-ONLY command - it cannot cause movement.
+request_data = bytes([VBUS_PARAM_ID & 0xFF, VBUS_PARAM_ID >> 8, 0, 0, 0, 0, 0, 0])
 for motor_id in range(1, 128):
-    # Print progress on the same line
-    print(f"Scanning ID: {motor_id}", end='\r')
-    
-    try:
-        flush_bus(bus)
-        
-        # We try to read 'vbus' (Voltage Bus). 
-        # This is a READ-ONLY command. It asks the motor "What is your voltage?"
-        # It cannot cause movement.
-        val = client.read_param(motor_id, 'vbus')
-        
-        if val is not None:
-            # If we get a valid number back, the motor exists!
-            print(f"Scanning ID: {motor_id} -> [FOUND!] (Voltage: {val:.2f}V)")
-            found_ids.append(motor_id)
-            
-    except Exception:
-        # If the read times out (no motor there), we just move to the next one
-        pass
+    arb_id = motor_id | (HOST_ID << 8) | (READ_PARAM << 24)
+    msg = can.Message(arbitration_id=arb_id, data=request_data, is_extended_id=True)
+    while True:
+        try:
+            bus.send(msg)
+            break
+        except can.CanError:
+            time.sleep(0.001)  # tx queue full - let the driver drain
+
+found = {}
+deadline = time.time() + COLLECT_MAX_SEC
+while time.time() < deadline:
+    msg = bus.recv(timeout=COLLECT_QUIET_SEC)
+    if msg is None:
+        break  # bus went quiet - every motor that exists has answered
+    if msg.is_error_frame:
+        continue
+    msg_type = (msg.arbitration_id >> 24) & 0x1F
+    motor_id = (msg.arbitration_id >> 8) & 0xFF
+    if msg_type == READ_PARAM and motor_id not in found:
+        voltage = _unpack_f32_from(msg.data, 4)[0]
+        found[motor_id] = voltage
+        print(f"ID {motor_id:3d} -> [FOUND!] (Voltage: {voltage:.2f}V)")
 
 print("\n" + "-" * 40)
-if found_ids:
-    print(f"SUCCESS! Your Motor ID is: {found_ids}")
+if found:
+    print(f"SUCCESS! Your Motor ID is: {sorted(found)}")
 else:
     print("No motors found. Check power and CAN cables.")
 
 # Clean up
-bus.shutdown()
\ No newline at end of file
+bus.shutdown()
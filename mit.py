@@ -2,7 +2,6 @@ import can
 import time
 import struct
 import math
-import numpy as np
 import enum
 import sys
 import traceback
@@ -57,10 +56,28 @@ MOTOR_ID_TO_TYPE_MAP = {
     20: 'O2'  # R_Ankle
 }
 
-def scale_value_to_u16(value, v_min, v_max):
-    """Clips and scales a float value to a 16-bit unsigned integer."""
-    scaled = 65535.0 * (np.clip(value, v_min, v_max) - v_min) / (v_max - v_min)
-    return int(scaled)
+def make_scaler(v_min, v_max):
+    """Bake one range's constants into a dedicated clamp+scale closure."""
+    k = 65535.0 / (v_max - v_min)
+    def scale(value):
+        if value < v_min:
+            value = v_min
+        elif value > v_max:
+            value = v_max
+        return int((value - v_min) * k)
+    return scale
+
+# Specialize a scaler per motor type and field: the limits are fixed for the
+# life of the run, so bake them in instead of re-reading the dict every call
+for _p in MOTOR_TYPE_PARAMS.values():
+    for _k in ('P', 'V', 'KP', 'KD', 'T'):
+        _p['_scale_%s' % _k.lower()] = make_scaler(_p['%s_MIN' % _k], _p['%s_MAX' % _k])
+
+# Precompile the payload struct once instead of re-parsing '>HHHH' on every
+# send, and pack into one reusable buffer instead of allocating fresh bytes
+_CTRL_STRUCT = struct.Struct('>HHHH')
+_ctrl_pack_into = _CTRL_STRUCT.pack_into
+_CTRL_BUF = bytearray(8)
 
 # --- MODIFIED: Function now requires motor-specific params ---
 def send_control_command(bus, motor_id, pos, vel, kp, kd, torque, params):
@@ -68,12 +85,12 @@ def send_control_command(bus, motor_id, pos, vel, kp, kd, torque, params):
     Builds and sends the MIT control command using the correct scaling
     parameters for the specified motor type.
     """
-    # 1. Scale all values using the provided params dictionary
-    angle_u16 = scale_value_to_u16(pos, params['P_MIN'], params['P_MAX'])
-    vel_u16 = scale_value_to_u16(vel, params['V_MIN'], params['V_MAX'])
-    kp_u16 = scale_value_to_u16(kp, params['KP_MIN'], params['KP_MAX'])
-    kd_u16 = scale_value_to_u16(kd, params['KD_MIN'], params['KD_MAX'])
-    torque_u16 = scale_value_to_u16(torque, params['T_MIN'], params['T_MAX'])
+    # 1. Scale all values with the motor type's specialized scalers
+    angle_u16 = params['_scale_p'](pos)
+    vel_u16 = params['_scale_v'](vel)
+    kp_u16 = params['_scale_kp'](kp)
+    kd_u16 = params['_scale_kd'](kd)
+    torque_u16 = params['_scale_t'](torque)
 
     # 2. Build the CAN Arbitration ID
     mux_part = (MUX_CONTROL & 0xFF) << 24
@@ -81,10 +98,10 @@ def send_control_command(bus, motor_id, pos, vel, kp, kd, torque, params):
     id_part = motor_id & 0xFF
     arbitration_id = mux_part | torque_part | id_part
 
-    # 3. Build the 8-byte Data Payload (Big-Endian)
-    data = struct.pack('>HHHH', angle_u16, vel_u16, kp_u16, kd_u16)
+    # 3. Build the 8-byte Data Payload (Big-Endian) in the reusable buffer
+    _ctrl_pack_into(_CTRL_BUF, 0, angle_u16, vel_u16, kp_u16, kd_u16)
 
-    msg = can.Message(arbitration_id=arbitration_id, data=data, is_extended_id=True, dlc=8)
+    msg = can.Message(arbitration_id=arbitration_id, data=_CTRL_BUF, is_extended_id=True, dlc=8)
     bus.send(msg)
 
 # --- MAIN EXECUTION BLOCK (Simplified for clarity) ---
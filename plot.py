@@ -0,0 +1,51 @@
+# plot.py
+# Renders step-response recordings saved by simultaneous.py as .npz files.
+# Keeping the plotting here means sweep runs never pay the matplotlib import.
+#
+# Usage: python plot.py run_20_kp10_kd0.2.npz [more.npz ...]
+
+import sys
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # plot goes straight to PNG; skip GUI backend startup
+import matplotlib.pyplot as plt
+
+FULL_ROTATION_RAD = 2 * 3.14159
+
+def plot_run(npz_path):
+    data = np.load(npz_path)
+    ts = data['t']
+    tgt_deg = float(data['tgt'])  # the target is saved as a scalar
+    pos_deg = data['pos'] * (360.0 / FULL_ROTATION_RAD)
+    vel_rps = data['vel']
+
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), sharex=True, constrained_layout=True)
+
+    # Position Plot — the constant target is drawn as a horizontal rule; the
+    # data arrays come straight from the npz, so no per-point conversion
+    ax1.plot(ts, pos_deg, 'b-', label='Actual Position')
+    ax1.axhline(tgt_deg, color='r', ls='--', label='Target Position')
+    ax1.set_title(f'Step Response ({npz_path})')
+    ax1.set_ylabel('Position (degrees)')
+    ax1.legend()
+    ax1.grid(True)
+
+    # Velocity Plot
+    ax2.plot(ts, vel_rps, 'g-', label='Actual Velocity')
+    ax2.set_xlabel('Time (s)')
+    ax2.set_ylabel('Velocity (rad/s)')
+    ax2.legend()
+    ax2.grid(True)
+
+    plot_filename = npz_path.rsplit('.', 1)[0] + '.png'
+    fig.savefig(plot_filename, dpi=100)
+    plt.close(fig)
+    print(f"Plot saved as: {plot_filename}")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python plot.py <run.npz> [more.npz ...]")
+        sys.exit(1)
+    for path in sys.argv[1:]:
+        plot_run(path)
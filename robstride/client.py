@@ -1,7 +1,9 @@
 import dataclasses
 import enum
 import math
+import queue
 import struct
+import threading
 from typing import List
 
 import can
@@ -82,6 +84,13 @@ params = [
 
 param_ids_by_name = dict(params)
 
+# Precompiled once at import; unpack_from reads fields straight out of the
+# received frame's buffer instead of allocating a bytes slice per field
+_unpack_u16_from = struct.Struct('<H').unpack_from
+_unpack_f32_from = struct.Struct('<f').unpack_from
+_unpack_be16_from = struct.Struct('>H').unpack_from
+_pack_f32 = struct.Struct('<f').pack
+
 class Client:
     def __init__(self, bus: can.BusABC, retry_count=2, recv_timeout=2, host_can_id=0xAA):
         self.bus = bus
@@ -90,6 +99,8 @@ class Client:
         self.host_can_id = host_can_id
         self._recv_count = 0
         self._recv_error_count = 0
+        self._rx_thread = None
+        self._rx_queue = None
 
     def enable(self, motor_id: int, motor_model=1) -> FeedbackResp:
         self.bus.send(self._rs_msg(MotorMsg.Enable, self.host_can_id, motor_id, [0, 0, 0, 0, 0, 0, 0, 0]))
@@ -141,17 +152,46 @@ class Client:
         
         self._parse_and_validate_resp_arbitration_id(resp, MotorMsg.ReadParam.value, motor_id)
 
-        resp_param_id = struct.unpack('<H', resp.data[:2])[0]
+        resp_param_id = _unpack_u16_from(resp.data, 0)[0]
         if resp_param_id != param_id:
             raise Exception('Invalid param id')
 
         if param_id == 0x7005:
             value = RunMode(int(resp.data[4]))
         else:
-            value = struct.unpack('<f', resp.data[4:])[0]
+            value = _unpack_f32_from(resp.data, 4)[0]
         
         return value
 
+    def read_params(self, motor_id: int, param_ids) -> list:
+        """Read several parameters with one round of pipelined requests.
+
+        All requests are sent back-to-back before any reply is awaited, so
+        the bus round-trips overlap instead of costing full latency per
+        parameter. Returns the values in the same order as param_ids.
+        """
+        param_ids = [self._normalize_param_id(p) for p in param_ids]
+
+        for param_id in param_ids:
+            data = [param_id & 0xFF, param_id >> 8, 0, 0, 0, 0, 0, 0]
+            self.bus.send(self._rs_msg(MotorMsg.ReadParam, self.host_can_id, motor_id, data))
+
+        values = {}
+        while len(values) < len(param_ids):
+            resp = self._recv()
+            self._parse_and_validate_resp_arbitration_id(resp, MotorMsg.ReadParam.value, motor_id)
+
+            resp_param_id = _unpack_u16_from(resp.data, 0)[0]
+            if resp_param_id not in param_ids:
+                raise Exception('Invalid param id')
+
+            if resp_param_id == 0x7005:
+                values[resp_param_id] = RunMode(int(resp.data[4]))
+            else:
+                values[resp_param_id] = _unpack_f32_from(resp.data, 4)[0]
+
+        return [values[param_id] for param_id in param_ids]
+
     def write_param(self, motor_id: int, param_id: int | str, param_value: float | RunMode | int, motor_model=1) -> FeedbackResp:
         param_id = self._normalize_param_id(param_id)
 
@@ -163,13 +203,43 @@ class Client:
                 int_value = param_value
             data += bytes([int_value, 0, 0, 0])
         else:
-            data += struct.pack('<f', param_value)
+            data += _pack_f32(param_value)
 
         self.bus.send(self._rs_msg(MotorMsg.WriteParam, self.host_can_id, motor_id, data))
         resp = self._recv()
 
         return self._parse_feedback_resp(resp, motor_id, motor_model)
 
+    def resolve_param(self, param_id: int | str) -> int:
+        """Resolve a parameter name to its numeric ID.
+
+        Hot loops should call this once and pass the returned int to
+        read_param/read_params, skipping the name lookup on every call.
+        """
+        return self._normalize_param_id(param_id)
+
+    def start_reader(self):
+        """Move frame reception onto a dedicated background thread.
+
+        Each bus.recv(timeout) call goes through select internally; with the
+        reader running, one thread blocks in recv permanently and hands frames
+        over via a queue, so the calling thread's hot loop only waits on the
+        queue. The thread is a daemon and dies with the process.
+        """
+        if self._rx_thread is not None:
+            return
+        self._rx_queue = queue.SimpleQueue()
+        self._rx_thread = threading.Thread(target=self._rx_loop, daemon=True)
+        self._rx_thread.start()
+
+    def _rx_loop(self):
+        recv = self.bus.recv
+        put = self._rx_queue.put
+        while True:
+            msg = recv(None)
+            if msg is not None:
+                put(msg)
+
     def error_rate(self) -> float:
         return self._recv_error_count / self._recv_count
 
@@ -181,7 +251,13 @@ class Client:
         retry_count = 0
         while retry_count <= self.retry_count:
             self._recv_count += 1
-            resp = self.bus.recv(self.recv_timeout)
+            if self._rx_thread is not None:
+                try:
+                    resp = self._rx_queue.get(timeout=self.recv_timeout)
+                except queue.Empty:
+                    resp = None
+            else:
+                resp = self.bus.recv(self.recv_timeout)
             if not resp:
                 raise Exception('No response from motor received')
             if not resp.is_error_frame:
@@ -224,18 +300,18 @@ class Client:
 
         mode = MotorMode((aid & 0x400000) >> 22)
 
-        angle_raw = struct.unpack('>H', resp.data[0:2])[0]
+        angle_raw = _unpack_be16_from(resp.data, 0)[0]
         angle = (float(angle_raw) / 65535 * 8 * math.pi) - 4 * math.pi
 
-        velocity_raw = struct.unpack('>H', resp.data[2:4])[0]
+        velocity_raw = _unpack_be16_from(resp.data, 2)[0]
         velocity_range = 88 if motor_model == 1 else 30
         velocity = (float(velocity_raw) / 65535 * velocity_range) - velocity_range/2
 
-        torque_raw = struct.unpack('>H', resp.data[4:6])[0]
+        torque_raw = _unpack_be16_from(resp.data, 4)[0]
         torque_range = 34 if motor_model == 1 else 240
         torque = (float(torque_raw) / 65535 * torque_range) - torque_range/2
 
-        temp_raw = struct.unpack('>H', resp.data[6:8])[0]
+        temp_raw = _unpack_be16_from(resp.data, 6)[0]
         temp = float(temp_raw) / 10
 
         return FeedbackResp(motor_id, errors, mode, angle, velocity, torque, temp)
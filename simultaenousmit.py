@@ -1,8 +1,7 @@
-import can
+import socket
 import time
 import struct
 import math
-import numpy as np
 import sys
 import traceback
 
@@ -58,22 +57,58 @@ MOTOR_ID_TO_TYPE_MAP = {
     5: 'O5'  # The 05 Motor
 }
 
-def scale_value_to_u16(value, v_min, v_max):
-    """Clips and scales a float value to a 16-bit unsigned integer."""
-    scaled = 65535.0 * (np.clip(value, v_min, v_max) - v_min) / (v_max - v_min)
-    return int(scaled)
-
-def send_control_command(bus, motor_id, pos, vel, kp, kd, torque, params):
+def make_scaler(v_min, v_max):
+    """Bake one range's constants into a dedicated clamp+scale closure."""
+    k = 65535.0 / (v_max - v_min)
+    def scale(value):
+        if value < v_min:
+            value = v_min
+        elif value > v_max:
+            value = v_max
+        return int((value - v_min) * k)
+    return scale
+
+# Specialize a scaler per motor type and field: the limits are fixed for the
+# life of the run, so bake them in instead of re-reading the dict every call
+for _p in MOTOR_TYPE_PARAMS.values():
+    for _k in ('P', 'V', 'KP', 'KD', 'T'):
+        _p['_scale_%s' % _k.lower()] = make_scaler(_p['%s_MIN' % _k], _p['%s_MAX' % _k])
+
+# Precompile the payload struct once instead of re-parsing '>HHHH' on every send
+_CTRL_STRUCT = struct.Struct('>HHHH')
+_ctrl_pack = _CTRL_STRUCT.pack
+
+# Raw SocketCAN frame layout: u32 can_id, u8 len, 3 pad bytes, 8 data bytes.
+# This script only ever sends, so we talk to the kernel directly instead of
+# paying python-can's Message/notifier overhead on every frame.
+_CAN_FRAME = struct.Struct('=IB3x8s')
+
+def open_can_socket(channel):
+    sock = socket.socket(socket.AF_CAN, socket.SOCK_RAW, socket.CAN_RAW)
+    sock.bind((channel,))
+    return sock
+
+def build_frame(arbitration_id, data=b''):
+    """Pack a 16-byte can_frame with the extended-frame flag set."""
+    return _CAN_FRAME.pack(arbitration_id | socket.CAN_EFF_FLAG, 8, data.ljust(8, b'\x00'))
+
+def send_frames(sock, frames):
+    # The socket module doesn't expose sendmmsg, so prebuilt frames go out as
+    # back-to-back send() calls — one write syscall each and nothing else.
+    for frame in frames:
+        sock.send(frame)
+
+def build_control_frame(motor_id, pos, vel, kp, kd, torque, params):
     """
-    Builds and sends the MIT control command using the correct scaling
+    Builds the MIT control command frame using the correct scaling
     parameters for the specified motor type.
     """
-    # 1. Scale all values using the provided params dictionary
-    angle_u16 = scale_value_to_u16(pos, params['P_MIN'], params['P_MAX'])
-    vel_u16 = scale_value_to_u16(vel, params['V_MIN'], params['V_MAX'])
-    kp_u16 = scale_value_to_u16(kp, params['KP_MIN'], params['KP_MAX'])
-    kd_u16 = scale_value_to_u16(kd, params['KD_MIN'], params['KD_MAX'])
-    torque_u16 = scale_value_to_u16(torque, params['T_MIN'], params['T_MAX'])
+    # 1. Scale all values with the motor type's specialized scalers
+    angle_u16 = params['_scale_p'](pos)
+    vel_u16 = params['_scale_v'](vel)
+    kp_u16 = params['_scale_kp'](kp)
+    kd_u16 = params['_scale_kd'](kd)
+    torque_u16 = params['_scale_t'](torque)
 
     # 2. Build the CAN Arbitration ID
     mux_part = (MUX_CONTROL & 0xFF) << 24
@@ -82,10 +117,9 @@ def send_control_command(bus, motor_id, pos, vel, kp, kd, torque, params):
     arbitration_id = mux_part | torque_part | id_part
 
     # 3. Build the 8-byte Data Payload (Big-Endian)
-    data = struct.pack('>HHHH', angle_u16, vel_u16, kp_u16, kd_u16)
+    data = _ctrl_pack(angle_u16, vel_u16, kp_u16, kd_u16)
 
-    msg = can.Message(arbitration_id=arbitration_id, data=data, is_extended_id=True, dlc=8)
-    bus.send(msg)
+    return build_frame(arbitration_id, data)
 
 def get_motor_params(motor_id):
     m_type = MOTOR_ID_TO_TYPE_MAP.get(motor_id)
@@ -95,7 +129,7 @@ def get_motor_params(motor_id):
 
 # --- MAIN EXECUTION BLOCK ---
 if __name__ == "__main__":
-    bus = None
+    sock = None
 
     print("="*50)
     print(f"Simultaneous Test for Motor IDs: {MOTORS_TO_TEST}")
@@ -111,39 +145,38 @@ if __name__ == "__main__":
 
     input("Ensure motors are powered. Press Enter to START...")
 
+    # Fixed frames built once, before the socket even opens
+    enable_frames = [build_frame((MUX_ENABLE << 24) | (HOST_ID << 8) | mid)
+                     for mid in MOTORS_TO_TEST]
+    disable_frames = [build_frame((MUX_DISABLE << 24) | (HOST_ID << 8) | mid)
+                      for mid in MOTORS_TO_TEST]
+
     try:
-        bus = can.interface.Bus(channel=CAN_INTERFACE, bustype='socketcan')
+        sock = open_can_socket(CAN_INTERFACE)
         print(f"Connected to CAN.")
 
+        # Prebuild the motion frames up front so each step is nothing but writes
+        move_frames = [build_control_frame(mid, target_pos, 0.0, KP_GAIN, KD_GAIN, 0.0, get_motor_params(mid))
+                       for mid in MOTORS_TO_TEST]
+        zero_frames = [build_control_frame(mid, 0.0, 0.0, KP_GAIN, KD_GAIN, 0.0, get_motor_params(mid))
+                       for mid in MOTORS_TO_TEST]
+
         # --- STEP 1: ENABLE MOTORS ---
         print("\n[1] Enabling Motors...")
-        for mid in MOTORS_TO_TEST:
-            enable_id = (MUX_ENABLE << 24) | (HOST_ID << 8) | mid
-            bus.send(can.Message(arbitration_id=enable_id, is_extended_id=True, dlc=8))
-        
+        send_frames(sock, enable_frames)
+
         time.sleep(1) # Wait for them to wake up
 
         # --- STEP 2: MOVE TO TARGET ---
         print(f"\n[2] Moving both motors to {target_pos} rad...")
-        
-        # We loop quickly to send commands "simultaneously"
-        for mid in MOTORS_TO_TEST:
-            params = get_motor_params(mid)
-            send_control_command(
-                bus, mid, target_pos, 0.0, KP_GAIN, KD_GAIN, 0.0, params
-            )
-        
+        send_frames(sock, move_frames)
+
         print("-> Holding for 5 seconds...")
         time.sleep(5)
 
         # --- STEP 3: MOVE TO ZERO ---
         print(f"\n[3] Moving both motors back to 0.0 rad...")
-        
-        for mid in MOTORS_TO_TEST:
-            params = get_motor_params(mid)
-            send_control_command(
-                bus, mid, 0.0, 0.0, KP_GAIN, KD_GAIN, 0.0, params
-            )
+        send_frames(sock, zero_frames)
 
         print("-> Holding for 2 seconds before disable...")
         time.sleep(2)
@@ -153,11 +186,8 @@ if __name__ == "__main__":
         traceback.print_exc()
 
     finally:
-        if bus:
+        if sock:
             print(f"\n[Final] Disabling all motors...")
-            for mid in MOTORS_TO_TEST:
-                disable_id = (MUX_DISABLE << 24) | (HOST_ID << 8) | mid
-                bus.send(can.Message(arbitration_id=disable_id, is_extended_id=True, dlc=8))
-            
-            bus.shutdown()
+            send_frames(sock, disable_frames)
+            sock.close()
             print("Sequence Complete.")
\ No newline at end of file